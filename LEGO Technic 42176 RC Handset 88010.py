@@ -1,7 +1,12 @@
 import asyncio
+import argparse
+import logging
+import os
 import sys
 from bleak import BleakScanner, BleakClient
 import time
+from rc_logging import (log, LOG_LEVELS, TickStats, benchmark_logging, log_level_name,
+                        setup_logging, stop_logging, watch_log_level_input)
 from enum import IntEnum
 
 start_time = 0
@@ -32,23 +37,23 @@ class LEGOHandset:
             devices = BleakScanner.discover(timeout=20)
             return devices
         except Exception as e:
-            print(f"Discovery failed with error: {e}")
+            log.error("Discovery failed with error: %s", e)
             return None
 
     async def scan_and_connect(self):
         scanner = BleakScanner()
-        print(f"searching for LEGO Handset")
+        log.info("searching for LEGO Handset")
         devices = await scanner.discover(timeout =5)
 
         for device in devices:
             if device.name is not None and self.device_name in device.name:
-                print(f"Found device: {device.name} with address: {device.address}")
+                log.info("Found device: %s with address: %s", device.name, device.address)
                 self.client = BleakClient(device)
 
                 
                 await self.client.connect()
                 if self.client.is_connected:
-                    print(f"Connected to {self.device_name}")
+                    log.info("Connected to %s", self.device_name)
                     
                     #paired = await self.client.pair()#protection_level = 2) # this is crucial!!!
                     #if not paired:
@@ -60,8 +65,8 @@ class LEGOHandset:
 
                     return True
                 else:
-                    print(f"Failed to connect to {self.device_name}")
-        print(f"Device {self.device_name} not found.")
+                    log.error("Failed to connect to %s", self.device_name)
+        log.warning("Device %s not found.", self.device_name)
         return False  
 
     async def setNotifications(self, port, enable=True):
@@ -113,7 +118,7 @@ class LEGOHandset:
     async def send_data(self, data):
         global start_time
         if self.client is None:
-            print("No BLE client connected.")
+            log.error("No BLE client connected.")
             return
 
         try:
@@ -126,9 +131,11 @@ class LEGOHandset:
             elapsed_time_ms = (time.time() - start_time) * 1000
             #print(f"Timestamp: {elapsed_time_ms:.2f} ms", end=" ")
             #print(' '.join(f'{byte:02x}' for byte in data))
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("wrote %s", data.hex(" "))
 
         except Exception as e:
-            print(f"Failed to write data: {e}")
+            log.error("Failed to write data to %s: %s", self.device_name, e)
 
     async def disconnect(self):
         if self.client and self.client.is_connected:
@@ -136,7 +143,7 @@ class LEGOHandset:
             await self.setNotifications(self.ID_BTNS_B, False)
             await self.client.stop_notify(self.char_uuid)
             await self.client.disconnect()
-            print("Disconnected from the device")
+            log.info("Disconnected from the device")
     
     LED_MODE_COLOR = 0x00
     LED_MODE_RGB = 0x01
@@ -183,53 +190,53 @@ class TechnicMoveHub:
             devices = BleakScanner.discover(timeout=20)
             return devices
         except Exception as e:
-            print(f"Discovery failed with error: {e}")
+            log.error("Discovery failed with error: %s", e)
             return None
 
     async def scan_and_connect(self):
         scanner = BleakScanner()
-        print(f"searching for Technic Move Hub...")
+        log.info("searching for Technic Move Hub...")
         devices = await scanner.discover(timeout =5)
 
         for device in devices:
             if device.name is not None and self.device_name in device.name:
-                print(f"Found device: {device.name} with address: {device.address}")
+                log.info("Found device: %s with address: %s", device.name, device.address)
                 self.client = BleakClient(device)
 
                 
                 await self.client.connect()
                 if self.client.is_connected:
-                    print(f"Connected to {self.device_name}")
+                    log.info("Connected to %s", self.device_name)
                     
                     paired = await self.client.pair(protection_level = 2) # this is crucial!!!
                     if not paired:
-                        print(f"could not pair")
+                        log.warning("could not pair")
                     return True
                 else:
-                    print(f"Failed to connect to {self.device_name}")
-        print(f"Device {self.device_name} not found.")
+                    log.error("Failed to connect to %s", self.device_name)
+        log.warning("Device %s not found.", self.device_name)
         return False
 
     async def discover_services(self):
         if self.client is None:
-            print("No BLE client connected.")
+            log.error("No BLE client connected.")
             return []
 
         try:
             services = self.client.services
             for service in services:
-                print(f"Service: {service.uuid}")
+                log.info("Service: %s", service.uuid)
                 for char in service.characteristics:
-                    print(f"Characteristic: {char.uuid}")
+                    log.info("Characteristic: %s", char.uuid)
             return services
         except Exception as e:
-            print(f"Failed to discover services: {e}")
+            log.error("Failed to discover services: %s", e)
             return []
 
     async def send_data(self, data):
         global start_time
         if self.client is None:
-            print("No BLE client connected.")
+            log.error("No BLE client connected.")
             return
 
         try:
@@ -242,14 +249,16 @@ class TechnicMoveHub:
             elapsed_time_ms = (time.time() - start_time) * 1000
             #print(f"Timestamp: {elapsed_time_ms:.2f} ms", end=" ")
             #print(' '.join(f'{byte:02x}' for byte in data))
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("wrote %s", data.hex(" "))
 
         except Exception as e:
-            print(f"Failed to write data: {e}")
+            log.error("Failed to write data to %s: %s", self.device_name, e)
 
     async def disconnect(self):
         if self.client and self.client.is_connected:
             await self.client.disconnect()
-            print("Disconnected from the device")
+            log.info("Disconnected from the device")
     
     LED_MODE_COLOR = 0x00
     LED_MODE_RGB = 0x01
@@ -304,20 +313,20 @@ class TechnicMoveHub:
         #await asyncio.sleep(0.1)
 
 
-async def main():
+async def main(ticks, writes):
 
     #device_name = "Handset"  # Replace with your BLE device's name
     remote = LEGOHandset("Handset")
 
     if not await remote.scan_and_connect():
-        print("Handset not found!")
+        log.error("Handset not found!")
         return
     await remote.change_led_color(9) # red
 
     hub = TechnicMoveHub("Technic Move ")
     
     if not await hub.scan_and_connect():
-        print("Technic Move Hub not found!")
+        log.error("Technic Move Hub not found!")
         return    
     
     await hub.calibrate_steering()    
@@ -337,6 +346,8 @@ async def main():
 
     try:
         while True:
+            tick_start = time.perf_counter()
+            awaited = 0.0 # BLE writes and brake pause, kept out of the tick cost
             buttons = remote.pressed()
 
             # driving 
@@ -367,35 +378,44 @@ async def main():
 
             if toggle and not toggle_old:
                 if lights == hub.LIGHTS_OFF_OFF :
-                    print("lights on")
                     lights = hub.LIGHTS_ON_ON
+                    log.info("lights on", extra={"lights": lights})
                 else:
-                    print("lights off")
                     lights = hub.LIGHTS_OFF_OFF
+                    log.info("lights off", extra={"lights": lights})
             toggle_old = toggle                
             
             if brake and not was_brake:
+                brake_start = time.perf_counter()
                 await hub.drive(0, steering, hub.LIGHTS_OFF_ON)
                 await asyncio.sleep(0.4)
+                awaited += time.perf_counter() - brake_start
                 throttle = 0
                 throttle_old = 0
             
             if not brake and was_brake:
+                drive_start = time.perf_counter()
                 await hub.drive(throttle, steering, lights)
+                writes.add(time.perf_counter() - drive_start)
+                awaited += time.perf_counter() - drive_start
 
             was_brake = brake
             
             if steering != steering_old or throttle != throttle_old or lights != lights_old and not brake:
-                print("throttle", throttle, "steering", steering)
+                drive_start = time.perf_counter()
                 await hub.drive(throttle, steering, lights)
+                latency = time.perf_counter() - drive_start
+                writes.add(latency)
+                awaited += latency
+                latency_ms = round(latency * 1000, 1)
+                log.info("drive", extra={"throttle": throttle, "steering": steering, "lights": lights, "latency_ms": latency_ms})
             
             throttle_old = throttle
             steering_old = steering
             lights_old = lights
      
         
-            # Flush the output
-            sys.stdout.flush()
+            ticks.add(time.perf_counter() - tick_start - awaited)
 
             await asyncio.sleep(0.05)
 
@@ -406,5 +426,31 @@ async def main():
         await remote.disconnect()
 
 if __name__ == "__main__":
-    asyncio.run(main())
-
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log-level", type=str.upper, choices=LOG_LEVELS,
+                        default=os.environ.get("RC_LOG_LEVEL", "INFO").upper(),
+                        help="initial log verbosity, OFF disables logging (default: $RC_LOG_LEVEL or INFO)")
+    parser.add_argument("--bench-logging", action="store_true",
+                        help="measure the per-call cost of logging enabled vs. disabled and exit")
+    args = parser.parse_args()
+    # argparse doesn't check defaults against choices
+    if args.log_level not in LOG_LEVELS:
+        parser.error(f"invalid RC_LOG_LEVEL {args.log_level}, expected one of {', '.join(LOG_LEVELS)}")
+
+    if args.bench_logging:
+        benchmark_logging()
+        sys.exit()
+
+    listener, handler = setup_logging(args.log_level)
+    watch_log_level_input()
+    ticks = TickStats()
+    writes = TickStats()
+    try:
+        asyncio.run(main(ticks, writes))
+    finally:
+        level = log_level_name()
+        stop_logging(listener, handler)
+        # after the writer has stopped, so the summary comes last on stderr
+        print(f"tick cost (BLE writes and brake pause excluded, logging {level} at exit): {ticks.summary()}\n"
+              f"BLE drive write latency: {writes.summary()}\n"
+              f"log records dropped: {handler.dropped}", file=sys.stderr)
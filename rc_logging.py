@@ -0,0 +1,189 @@
+# Queue-backed logging shared by the RC scripts: records are handed to a
+# background writer thread, so a slow terminal can't stall the car.
+
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+log = logging.getLogger("rc")
+
+# structured fields picked up from `extra=` and appended to the log line
+LOG_FIELDS = ("throttle", "steering", "lights", "latency_ms")
+LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "OFF": logging.CRITICAL + 1,
+}
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops repeats of the same warning/error within `interval` seconds, so a
+    lost connection doesn't flood the console with "Failed to write data".
+    While a message keeps repeating, the next copy that gets through carries
+    the number of repeats dropped. Once no repeat has arrived for `interval`,
+    or on flush(), the last dropped repeat is passed to `emit` with the count.
+    """
+    def __init__(self, emit, interval=1.0):
+        super().__init__()
+        self.emit = emit
+        self.interval = interval
+        self.last_seen = {}
+        self.suppressed = {}
+        self.last_pruned = time.monotonic()
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_pruned >= self.interval:
+                self.prune(now)
+            if record.levelno < logging.WARNING:
+                return True
+            key = (record.name, record.levelno, record.getMessage())
+            last = self.last_seen.get(key)
+            if last is not None and now - last < self.interval:
+                count, _, _ = self.suppressed.get(key, (0, None, None))
+                self.suppressed[key] = (count + 1, record, now)
+                return False
+            self.last_seen[key] = now
+            record.suppressed = self.suppressed.pop(key, (0, None, None))[0]
+            return True
+
+    def prune(self, now):
+        for key, last in list(self.last_seen.items()):
+            _, _, last_dropped = self.suppressed.get(key, (0, None, last))
+            if now - max(last, last_dropped) >= self.interval:
+                del self.last_seen[key]
+                self.report(key)
+        self.last_pruned = now
+
+    def report(self, key):
+        count, record, _ = self.suppressed.pop(key, (0, None, None))
+        if count:
+            record.suppressed = count
+            self.emit(record)
+
+    def flush(self):
+        with self.lock:
+            for key in list(self.suppressed):
+                self.report(key)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread without formatting them first and
+    drops them once `max_pending` are waiting, so logging never blocks the
+    loop. The queue itself stays unbounded so the listener can always stop.
+    """
+    def __init__(self, log_queue, max_pending=1000):
+        super().__init__(log_queue)
+        self.max_pending = max_pending
+        self.dropped = 0
+        self.rate_limit = RateLimitFilter(self.enqueue)
+        self.addFilter(self.rate_limit)
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        if self.queue.qsize() >= self.max_pending:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+class FieldFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        fields = [f"{name}={getattr(record, name)}" for name in LOG_FIELDS if hasattr(record, name)]
+        if getattr(record, "suppressed", 0):
+            fields.append(f"suppressed={record.suppressed}")
+        if fields:
+            line += " " + " ".join(fields)
+        return line
+
+def set_log_level(level):
+    log.setLevel(LOG_LEVELS[level.upper()])
+
+def log_level_name():
+    return next(name for name, level in LOG_LEVELS.items() if level == log.level)
+
+def setup_logging(level="INFO", stream=None):
+    """
+    Routes log records through a queue to a background writer thread, so a
+    slow terminal can't stall the car. Pass the returned listener and
+    handler to stop_logging() before exiting to flush pending records.
+    """
+    log_queue = queue.Queue()
+    writer = logging.StreamHandler(stream)
+    writer.setFormatter(FieldFormatter("%(asctime)s %(levelname)-7s %(message)s"))
+    handler = DroppingQueueHandler(log_queue)
+    log.handlers[:] = [handler]
+    log.propagate = False
+    set_log_level(level)
+    listener = logging.handlers.QueueListener(log_queue, writer)
+    listener.start()
+    return listener, handler
+
+def stop_logging(listener, handler):
+    handler.rate_limit.flush()
+    listener.stop()
+
+def watch_log_level_input():
+    """
+    Lets the log level be changed while driving: type DEBUG, INFO, WARNING,
+    ERROR or OFF in the terminal and press Enter.
+    """
+    def read_levels():
+        for line in sys.stdin:
+            level = line.strip().upper()
+            if level in LOG_LEVELS:
+                set_log_level(level)
+                # handled directly so the confirmation isn't hidden by ERROR or OFF
+                log.handle(log.makeRecord(log.name, logging.WARNING, __file__, 0,
+                                          "log level set to %s", (level,), None))
+            elif level:
+                log.warning("unknown log level %s, expected one of %s", level, ", ".join(LOG_LEVELS))
+
+    if sys.stdin is not None:
+        threading.Thread(target=read_levels, daemon=True).start()
+
+class TickStats:
+    """Count, mean and worst case of a series of durations."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def summary(self):
+        if self.count == 0:
+            return "no samples"
+        return f"{self.count} samples, mean {self.total / self.count * 1e3:.3f} ms, max {self.worst * 1e3:.3f} ms"
+
+def benchmark_logging(ticks=1000, period=0.001):
+    """
+    Measures what the drive log call costs the control loop with logging
+    enabled vs. disabled. Calls are paced `period` seconds apart, like the
+    control loop, so the writer keeps up instead of records being dropped.
+    Needs no hub; records are written to os.devnull.
+    """
+    with open(os.devnull, "w") as sink:
+        for level in ("INFO", "OFF"):
+            listener, handler = setup_logging(level, sink)
+            cost = TickStats()
+            for i in range(ticks):
+                t0 = time.perf_counter()
+                log.info("drive", extra={"throttle": i % 100, "steering": 0, "lights": 0, "latency_ms": 0.0})
+                cost.add(time.perf_counter() - t0)
+                time.sleep(period)
+            stop_logging(listener, handler)
+            print(f"logging {level}: {cost.summary()}, {handler.dropped} records dropped")